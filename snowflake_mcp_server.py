@@ -5,18 +5,23 @@ A secure MCP server for executing SQL queries against Snowflake with configurabl
 Supports multiple authentication methods including key-pair, password, and SSO.
 """
 
+import asyncio
+import atexit
+import logging
 import os
+import re
 import sys
-import json
-from typing import Optional, Dict, Any
-from pathlib import Path
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
+import numpy as np
 import pandas as pd
 import snowflake.connector
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives.serialization import load_pem_private_key
+from snowflake.connector.constants import FIELD_NAME_TO_ID
+from snowflake.connector.options import installed_pandas
 
 # Load environment variables from .env file
 load_dotenv()
@@ -45,9 +50,23 @@ class SnowflakeConfig:
         
         # Query settings
         self.max_rows = int(os.getenv("SNOWFLAKE_MAX_ROWS", "1000"))
+        # Default: enough for max_rows plus the truncation probe row, rounded up
+        # to a multiple of 1024
+        self.chunk_size = self._get_positive_int_env(
+            "SNOWFLAKE_CHUNK_SIZE", (self.max_rows + 1 + 1023) // 1024 * 1024
+        )
+        self.display_max_rows = self._get_positive_int_env("SNOWFLAKE_DISPLAY_MAX_ROWS", 100)
         
         # Validate configuration
         self._validate_config()
+        
+        # Decode the private key once; it never changes while the server runs
+        self._private_key = None
+        if self.private_key_path and not self.password:
+            self._private_key = self._load_private_key()
+        
+        # Configuration is fixed after startup, so build connection params once
+        self._base_params = self._build_connection_params()
     
     def _get_required_env(self, key: str) -> str:
         """Get required environment variable or raise error."""
@@ -56,6 +75,19 @@ class SnowflakeConfig:
             raise ValueError(f"Required environment variable {key} is not set")
         return value
     
+    def _get_positive_int_env(self, key: str, default: int) -> int:
+        """Get an integer environment variable that must be at least 1."""
+        value = os.getenv(key)
+        if not value:
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            raise ValueError(f"{key} must be an integer, got {value!r}")
+        if number < 1:
+            raise ValueError(f"{key} must be at least 1, got {number}")
+        return number
+    
     def _validate_config(self):
         """Validate that at least one authentication method is configured."""
         has_password = bool(self.password)
@@ -71,16 +103,20 @@ class SnowflakeConfig:
             )
         
         if has_private_key:
-            key_path = Path(self.private_key_path)
-            if not key_path.exists():
+            if not os.path.isfile(self.private_key_path):
                 raise ValueError(f"Private key file not found: {self.private_key_path}")
     
     def get_connection_params(self) -> Dict[str, Any]:
-        """Get connection parameters for Snowflake connector."""
+        """Get a copy of the connection parameters for Snowflake connector."""
+        return dict(self._base_params)
+    
+    def _build_connection_params(self) -> Dict[str, Any]:
+        """Build connection parameters for Snowflake connector."""
         params = {
             "account": self.account_identifier,
             "user": self.username,
             "authenticator": self.authenticator,
+            "client_session_keep_alive": True,
         }
         
         # Add optional connection settings
@@ -97,12 +133,21 @@ class SnowflakeConfig:
         if self.password:
             params["password"] = self.password
         elif self.private_key_path:
-            params["private_key"] = self._load_private_key()
+            params["private_key"] = self._private_key
         
         return params
     
-    def _load_private_key(self):
-        """Load and return the private key for authentication."""
+    def _load_private_key(self) -> bytes:
+        """Load the private key and return it as unencrypted PKCS#8 DER bytes."""
+        # Imported here so password and SSO setups never load cryptography
+        from cryptography.hazmat.backends import default_backend
+        from cryptography.hazmat.primitives.serialization import (
+            Encoding,
+            NoEncryption,
+            PrivateFormat,
+            load_pem_private_key,
+        )
+        
         try:
             with open(self.private_key_path, 'rb') as key_file:
                 key_data = key_file.read()
@@ -113,19 +158,43 @@ class SnowflakeConfig:
                 password=passphrase,
                 backend=default_backend()
             )
-            return private_key
+            return private_key.private_bytes(
+                encoding=Encoding.DER,
+                format=PrivateFormat.PKCS8,
+                encryption_algorithm=NoEncryption()
+            )
         except Exception as e:
             raise ValueError(f"Failed to load private key from {self.private_key_path}: {str(e)}")
 
 
+# Log to stderr to avoid interfering with MCP protocol on stdout
+logger = logging.getLogger("snowflake-mcp")
+_log_handler = logging.StreamHandler(sys.stderr)
+_log_handler.setFormatter(logging.Formatter("[SNOWFLAKE-MCP] %(message)s"))
+logger.addHandler(_log_handler)
+logger.propagate = False
+
+_log_level = os.getenv("SNOWFLAKE_LOG_LEVEL", "INFO").upper()
+if _log_level in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+    logger.setLevel(_log_level)
+else:
+    logger.setLevel(logging.INFO)
+    logger.error(f"Invalid SNOWFLAKE_LOG_LEVEL '{_log_level}', using INFO")
+
+
 def log_error(message: str):
     """Log error to stderr to avoid interfering with MCP protocol."""
-    print(f"[SNOWFLAKE-MCP] {message}", file=sys.stderr)
+    logger.error(message)
+
+
+def log_warning(message: str):
+    """Log warning to stderr to avoid interfering with MCP protocol."""
+    logger.warning(message)
 
 
 def log_info(message: str):
     """Log info to stderr to avoid interfering with MCP protocol."""
-    print(f"[SNOWFLAKE-MCP] {message}", file=sys.stderr)
+    logger.info(message)
 
 
 # Initialize configuration
@@ -142,12 +211,420 @@ mcp = FastMCP(
     dependencies=["snowflake-connector-python", "pandas", "cryptography"]
 )
 
+# Leading keywords that trigger a security alert
+_DANGEROUS_RE = re.compile(
+    r'^\s*(DROP|DELETE|TRUNCATE|ALTER|CREATE\s+USER|GRANT|REVOKE)\b',
+    re.IGNORECASE
+)
+
+# String literals, quoted identifiers and comments, blanked out before scanning SQL
+_SQL_QUOTED_RE = re.compile(
+    r"'(?:[^'\\]|\\.|'')*'"      # 'string'
+    r'|"(?:[^"]|"")*"'            # "identifier"
+    r"|\$\$.*?\$\$"               # $$string$$
+    r"|--[^\n]*|//[^\n]*|/\*.*?\*/",  # comments
+    re.DOTALL
+)
+_PAREN_OR_ORDER_BY_RE = re.compile(r"[()]|\bORDER\s+BY\b", re.IGNORECASE)
+
+# Compilation errors caused by wrapping a query as a subquery:
+# 1003 = syntax error, 2025 = duplicate column name
+_LIMIT_WRAP_ERRNOS = (1003, 2025)
+
+
+# Idle sessions ready for reuse, mapped to their (database, schema, warehouse)
+# context and ordered from least to most recently returned. A session is checked
+# out by one query at a time, so no two calls ever share it.
+ConnectionKey = Tuple[Optional[str], Optional[str], Optional[str]]
+_IDLE_CONNECTIONS: "OrderedDict[snowflake.connector.SnowflakeConnection, ConnectionKey]" = (
+    OrderedDict()
+)
+_IDLE_CONNECTIONS_LOCK = threading.Lock()
+MAX_CACHED_CONNECTIONS = 4
+
+# Statements that change session or transaction state; their session is closed
+# afterwards instead of being reused
+_SESSION_STATE_RE = re.compile(
+    r'^\s*(USE|ALTER\s+SESSION|SET|UNSET'
+    r'|BEGIN|START\s+TRANSACTION|COMMIT|ROLLBACK)\b',
+    re.IGNORECASE
+)
+
+
+def _normalize_identifier(name: str) -> str:
+    """Normalize an identifier for comparison with session state."""
+    return name.strip('"').upper()
+
+
+def connection_key(
+    database: Optional[str],
+    schema: Optional[str],
+    warehouse: Optional[str]
+) -> ConnectionKey:
+    """Build the pool key for a session context, normalized for case."""
+    return tuple(
+        _normalize_identifier(name) if name else None
+        for name in (database, schema, warehouse)
+    )
+
+
+def _session_matches(
+    conn: snowflake.connector.SnowflakeConnection, key: ConnectionKey
+) -> bool:
+    """Check that a pooled session is still in the context it was opened for."""
+    database, schema, warehouse = key
+    expected_and_actual = (
+        (database, conn.database),
+        (schema, conn.schema),
+        (warehouse, conn.warehouse),
+        (config.role and _normalize_identifier(config.role), conn.role),
+    )
+    for expected, actual in expected_and_actual:
+        if expected and _normalize_identifier(actual or "") != expected:
+            return False
+    return True
+
+
+def _close_quietly(conn: snowflake.connector.SnowflakeConnection):
+    """Close a connection, logging rather than raising on failure."""
+    try:
+        conn.close()
+    except Exception as e:
+        log_error(f"Error closing connection: {str(e)}")
+
+
+def checkout_connection(
+    database: Optional[str],
+    schema: Optional[str],
+    warehouse: Optional[str]
+) -> snowflake.connector.SnowflakeConnection:
+    """
+    Take an idle session for the given context out of the pool, or connect.
+    
+    The caller has exclusive use of the connection until it hands it back with
+    release_connection(). An idle session whose database, schema, warehouse or
+    role no longer matches is closed and replaced.
+    
+    Args:
+        database: Database for the session
+        schema: Schema for the session
+        warehouse: Warehouse for the session
+    
+    Returns:
+        Open Snowflake connection
+    """
+    key = connection_key(database, schema, warehouse)
+    with _IDLE_CONNECTIONS_LOCK:
+        conn = next(
+            (idle for idle, idle_key in reversed(_IDLE_CONNECTIONS.items())
+             if idle_key == key),
+            None
+        )
+        if conn is not None:
+            del _IDLE_CONNECTIONS[conn]
+    
+    if conn is not None:
+        if not conn.is_closed() and _session_matches(conn, key):
+            return conn
+        log_info("Pooled session context changed; reconnecting")
+        _close_quietly(conn)
+    
+    overrides = {
+        "database": database,
+        "schema": schema,
+        "warehouse": warehouse,
+    }
+    conn_params = config.get_connection_params()
+    conn_params.update({name: value for name, value in overrides.items() if value})
+    
+    # Connect outside the lock so a slow login (e.g. SSO) blocks no other query
+    log_info("Connecting to Snowflake...")
+    return snowflake.connector.connect(**conn_params)
+
+
+def release_connection(
+    conn: snowflake.connector.SnowflakeConnection,
+    database: Optional[str],
+    schema: Optional[str],
+    warehouse: Optional[str],
+    reusable: bool = True
+):
+    """
+    Hand a checked-out connection back to the pool, or close it.
+    
+    Args:
+        conn: Connection obtained from checkout_connection()
+        database: Database the connection was checked out for
+        schema: Schema the connection was checked out for
+        warehouse: Warehouse the connection was checked out for
+        reusable: False if the session must not serve later queries
+    """
+    if not reusable or conn.is_closed():
+        _close_quietly(conn)
+        return
+    
+    # Keep only the most recently used idle sessions open
+    evicted = []
+    with _IDLE_CONNECTIONS_LOCK:
+        _IDLE_CONNECTIONS[conn] = connection_key(database, schema, warehouse)
+        while len(_IDLE_CONNECTIONS) > MAX_CACHED_CONNECTIONS:
+            evicted.append(_IDLE_CONNECTIONS.popitem(last=False)[0])
+    for idle in evicted:
+        _close_quietly(idle)
+
+
+def close_cached_connections():
+    """Close all idle Snowflake connections."""
+    with _IDLE_CONNECTIONS_LOCK:
+        connections = list(_IDLE_CONNECTIONS)
+        _IDLE_CONNECTIONS.clear()
+    for conn in connections:
+        _close_quietly(conn)
+    if connections:
+        log_info("Database connections closed")
+
+
+atexit.register(close_cached_connections)
+
+
+def has_top_level_order_by(sql_query: str) -> bool:
+    """
+    Check whether a query has an ORDER BY outside any parentheses.
+    
+    Args:
+        sql_query: The SQL query to inspect
+    
+    Returns:
+        True if the query ends with an ORDER BY of its own
+    """
+    depth = 0
+    for match in _PAREN_OR_ORDER_BY_RE.finditer(_SQL_QUOTED_RE.sub(" ", sql_query)):
+        token = match.group()
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif depth == 0:
+            return True
+    return False
+
+
+def build_limited_query(sql_query: str, limit: int) -> Optional[str]:
+    """
+    Wrap a SELECT query as a subquery so the server stops after limit rows.
+    
+    Args:
+        sql_query: The SQL query to wrap
+        limit: Maximum number of rows the wrapped query may return
+    
+    Returns:
+        The wrapped query, or None if the statement is not a SELECT or its row
+        order would not survive wrapping
+    """
+    tokens = sql_query.split(None, 1)
+    if not tokens or tokens[0].upper() not in ("SELECT", "WITH"):
+        return None
+    # An ORDER BY inside a subquery does not order the outer SELECT
+    if has_top_level_order_by(sql_query):
+        return None
+    # Newlines keep a trailing line comment from swallowing the closing paren
+    body = sql_query.rstrip().rstrip(";")
+    return f"SELECT * FROM (\n{body}\n) LIMIT {limit}"
+
+
+def rows_to_dataframe(description, rows) -> pd.DataFrame:
+    """
+    Build a DataFrame from fetched row tuples.
+    
+    Rows are transposed into columns up front so pandas does not have to walk
+    every row itself; NULL-free numeric columns become typed numpy arrays.
+    
+    Args:
+        description: Cursor description for the result set
+        rows: Row tuples returned by the cursor
+    
+    Returns:
+        DataFrame with one column per description entry
+    """
+    names = [col[0] for col in description]
+    if not rows:
+        return pd.DataFrame(columns=names)
+    
+    arrays = []
+    for col, values in zip(description, zip(*rows)):
+        type_code, scale = col[1], col[5]
+        if None not in values:
+            if type_code == FIELD_NAME_TO_ID["REAL"]:
+                values = np.fromiter(values, dtype=np.float64, count=len(values))
+            elif type_code == FIELD_NAME_TO_ID["FIXED"] and not scale:
+                try:
+                    values = np.fromiter(values, dtype=np.int64, count=len(values))
+                except OverflowError:
+                    # NUMBER(38, 0) can exceed int64; keep Python ints
+                    pass
+        arrays.append(values)
+    
+    # Key by position so duplicate column names survive
+    df = pd.DataFrame(dict(enumerate(arrays)), copy=False)
+    df.columns = names
+    return df
+
+
+def fetch_query_results(cursor, max_rows: int) -> Tuple[pd.DataFrame, bool]:
+    """
+    Fetch up to max_rows rows from an executed cursor as a DataFrame.
+    
+    Uses the connector's Arrow-backed pandas batches so rows are decoded straight
+    into columns, falling back to row-wise fetching when pyarrow is not installed,
+    the result has scaled NUMBER(p,s) columns (which Arrow turns into float64),
+    or the result set is not delivered in Arrow format (e.g. SHOW/DESCRIBE output).
+    
+    Args:
+        cursor: Cursor with an executed query that returned a result set
+        max_rows: Maximum number of rows to return
+    
+    Returns:
+        Tuple of (result DataFrame, whether more rows were available)
+    """
+    batches = None
+    # Rows keep scaled numbers as exact Decimals; the Arrow path would not
+    has_scaled_numbers = any(
+        col[1] == FIELD_NAME_TO_ID["FIXED"] and col[5] for col in cursor.description
+    )
+    # installed_pandas is only set when both pandas and pyarrow are available
+    if installed_pandas and not has_scaled_numbers:
+        try:
+            batches = iter(cursor.fetch_pandas_batches())
+        except snowflake.connector.errors.NotSupportedError:
+            pass
+    
+    if batches is None:
+        # Fetch one extra row to detect truncation in the same call
+        data = cursor.fetchmany(max_rows + 1)
+        truncated = len(data) > max_rows
+        return rows_to_dataframe(cursor.description, data[:max_rows]), truncated
+    
+    frames = []
+    row_count = 0
+    truncated = False
+    for batch in batches:
+        frames.append(batch)
+        row_count += len(batch)
+        if row_count >= max_rows:
+            truncated = row_count > max_rows or next(batches, None) is not None
+            break
+    
+    if not frames:
+        return pd.DataFrame(columns=[col[0] for col in cursor.description]), False
+    
+    # Concatenate once at the end rather than growing the frame per batch
+    if len(frames) == 1:
+        df = frames[0]
+    else:
+        df = pd.concat(frames, copy=False, ignore_index=True)
+    if truncated:
+        df = df.iloc[:max_rows]
+    return df, truncated
+
+
+def format_dataframe(df: pd.DataFrame, max_colwidth: int = 50) -> str:
+    """
+    Format a DataFrame as a fixed-width text table.
+    
+    Builds each column with vectorized numpy string operations, which is much
+    cheaper than DataFrame.to_string() on large results.
+    
+    Args:
+        df: DataFrame to format
+        max_colwidth: Maximum width of a cell before it is cut off with "..."
+    
+    Returns:
+        Text table with a header line and one line per row
+    """
+    if len(df.columns) == 0:
+        return ""
+    if len(df) == 0:
+        return "  ".join(str(name) for name in df.columns)
+    
+    header_cells = []
+    column_cells = []
+    # Select columns by position; df[name] is a DataFrame for duplicate names
+    for position, name in enumerate(df.columns):
+        column = df.iloc[:, position]
+        values = column.to_numpy(dtype=object)
+        # Cut cells while they are still Python strings; one extra character
+        # marks overflow. Converting first would size every cell of the numpy
+        # array to the longest value (e.g. a multi-MB VARIANT).
+        cells = np.array(
+            [
+                "NULL" if is_null else str(value)[:max_colwidth + 1]
+                for value, is_null in zip(values, pd.isna(values))
+            ],
+            dtype=str
+        )
+        cells = np.char.replace(np.char.replace(cells, "\n", " "), "\t", " ")
+        
+        lengths = np.char.str_len(cells)
+        too_long = lengths > max_colwidth
+        if too_long.any():
+            cut = cells[too_long].astype(f"<U{max_colwidth - 3}")
+            cells[too_long] = np.char.add(cut, "...")
+            lengths = np.char.str_len(cells)
+        
+        header = str(name)
+        width = max(len(header), int(lengths.max()))
+        # Right-align numbers, left-align everything else
+        if pd.api.types.is_numeric_dtype(column.dtype):
+            header_cells.append(header.rjust(width))
+            column_cells.append(np.char.rjust(cells, width))
+        else:
+            header_cells.append(header.ljust(width))
+            column_cells.append(np.char.ljust(cells, width))
+    
+    rows = column_cells[0]
+    for cells in column_cells[1:]:
+        rows = np.char.add(np.char.add(rows, "  "), cells)
+    
+    lines = ["  ".join(header_cells).rstrip()]
+    lines.extend(np.char.rstrip(rows).tolist())
+    return "\n".join(lines)
+
+
+def format_result_output(df: pd.DataFrame, total_rows: str) -> str:
+    """
+    Format the displayed portion of a result set for the tool response.
+    
+    Args:
+        df: Fetched query results
+        total_rows: Total row count description (e.g. "1000+")
+    
+    Returns:
+        Text table, capped at config.display_max_rows rows
+    """
+    try:
+        # Only format the rows that are displayed
+        output = format_dataframe(df.head(config.display_max_rows))
+        if len(df) > config.display_max_rows:
+            output += (
+                f"\n... {len(df) - config.display_max_rows} more rows "
+                f"(total {total_rows})"
+            )
+        return output
+    except Exception as e:
+        log_error(f"Error formatting results: {str(e)}")
+        return "\n".join([
+            "Error formatting results for display.",
+            f"Data shape: {df.shape}",
+            "Raw data available but too complex to display."
+        ])
+
 
 def execute_snowflake_query(
     sql_query: str, 
     database: Optional[str] = None, 
     schema: Optional[str] = None, 
-    warehouse: Optional[str] = None
+    warehouse: Optional[str] = None,
+    format_output: bool = True
 ) -> Dict[str, Any]:
     """
     Execute a SQL query on Snowflake with proper error handling.
@@ -157,82 +634,74 @@ def execute_snowflake_query(
         database: Override the default database
         schema: Override the default schema  
         warehouse: Override the default warehouse
+        format_output: Return results as formatted text ("output") instead of
+            a DataFrame ("result_df"), so formatting runs in the calling thread
     
     Returns:
         Dictionary containing query results and metadata
     """
     conn = None
     cursor = None
+    # Like a fresh session per call, USE/SET/transaction statements must not
+    # leak into later queries
+    reusable = not _SESSION_STATE_RE.match(sql_query[:64])
+    database = database or config.database
+    schema = schema or config.schema
+    warehouse = warehouse or config.warehouse
     
-    log_info(f"Executing query: {sql_query[:50]}{'...' if len(sql_query) > 50 else ''}")
+    if logger.isEnabledFor(logging.INFO):
+        log_info(f"Executing query: {sql_query[:50]}{'...' if len(sql_query) > 50 else ''}")
     
     try:
-        # Get connection parameters
-        conn_params = config.get_connection_params()
-        
-        # Override with function parameters if provided
-        if database:
-            conn_params["database"] = database
-        if schema:
-            conn_params["schema"] = schema
-        if warehouse:
-            conn_params["warehouse"] = warehouse
-        
-        # Connect to Snowflake
-        log_info("Connecting to Snowflake...")
-        conn = snowflake.connector.connect(**conn_params)
+        # Reuse an idle session for this context if one is open
+        conn = checkout_connection(database, schema, warehouse)
         
         # Execute the query
         cursor = conn.cursor()
-        cursor.execute(sql_query)
+        cursor.arraysize = config.chunk_size
+        
+        # Push the row limit to the server; one extra row signals truncation
+        limited_query = build_limited_query(sql_query, config.max_rows + 1)
+        if limited_query:
+            try:
+                cursor.execute(limited_query)
+            except snowflake.connector.errors.ProgrammingError as e:
+                # Only retry when wrapping broke compilation; anything else
+                # (missing table, permissions, timeouts) would fail again
+                if e.errno not in _LIMIT_WRAP_ERRNOS:
+                    raise
+                limited_query = None
+        if not limited_query:
+            cursor.execute(sql_query)
+        
+        # Current context as tracked by the connector's session state
+        context = {
+            "database": conn.database or "N/A",
+            "schema": conn.schema or "N/A",
+            "warehouse": conn.warehouse or "N/A"
+        }
         
         # Handle different types of queries
         if cursor.description:
             # Query returned data
-            columns = [col[0] for col in cursor.description]
-            data = cursor.fetchmany(config.max_rows)
-            row_count = len(data)
-            
-            # Check if results were truncated
-            remaining_rows = cursor.fetchone()
-            truncated = remaining_rows is not None
-            if truncated:
-                # Put the row back for accurate count if possible
-                total_rows = f"{row_count}+"
-            else:
-                total_rows = str(row_count)
-            
-            df = pd.DataFrame(data, columns=columns)
-            
-            # Get current context
-            context = {
-                "database": conn_params.get("database", "N/A"),
-                "schema": conn_params.get("schema", "N/A"), 
-                "warehouse": conn_params.get("warehouse", "N/A")
-            }
-            
-            try:
-                cursor.execute("SELECT CURRENT_DATABASE(), CURRENT_SCHEMA(), CURRENT_WAREHOUSE()")
-                context_row = cursor.fetchone()
-                if context_row:
-                    context = {
-                        "database": context_row[0] or "N/A",
-                        "schema": context_row[1] or "N/A",
-                        "warehouse": context_row[2] or "N/A"
-                    }
-            except Exception as e:
-                log_error(f"Could not retrieve current context: {str(e)}")
+            df, truncated = fetch_query_results(cursor, config.max_rows)
+            row_count = len(df)
+            total_rows = f"{row_count}+" if truncated else str(row_count)
             
-            return {
+            result = {
                 "success": True,
-                "result_df": df,
                 "sql_query": sql_query,
                 "row_count": row_count,
                 "total_rows": total_rows,
-                "column_count": len(columns),
+                "column_count": len(df.columns),
                 "context": context,
                 "truncated": truncated
             }
+            if format_output:
+                result["output"] = format_result_output(df, total_rows)
+            else:
+                result["result_df"] = df
+            return result
         else:
             # DDL/DML query with no result set
             log_info("Query executed successfully (no result set)")
@@ -240,16 +709,12 @@ def execute_snowflake_query(
             
             return {
                 "success": True,
-                "result_df": pd.DataFrame({"status": [f"Statement executed successfully. Rows affected: {affected_rows}"]}),
+                "output": f"Statement executed successfully. Rows affected: {affected_rows}",
                 "sql_query": sql_query,
                 "row_count": 1,
                 "total_rows": "1", 
                 "column_count": 1,
-                "context": {
-                    "database": conn_params.get("database", "N/A"),
-                    "schema": conn_params.get("schema", "N/A"),
-                    "warehouse": conn_params.get("warehouse", "N/A")
-                },
+                "context": context,
                 "truncated": False,
                 "affected_rows": affected_rows
             }
@@ -267,6 +732,8 @@ def execute_snowflake_query(
     except snowflake.connector.errors.DatabaseError as e:
         error_msg = f"Database Error: {str(e)}"
         log_error(error_msg)
+        # The session may be broken; reconnect on the next query
+        reusable = False
         return {
             "success": False,
             "error": error_msg,
@@ -277,6 +744,7 @@ def execute_snowflake_query(
     except Exception as e:
         error_msg = f"Unexpected error: {str(e)}"
         log_error(error_msg)
+        reusable = False
         return {
             "success": False,
             "error": error_msg,
@@ -285,15 +753,15 @@ def execute_snowflake_query(
         }
     
     finally:
-        # Clean up resources
+        # Clean up resources; the connection goes back to the pool for reuse
         try:
             if cursor:
                 cursor.close()
-            if conn:
-                conn.close()
-            log_info("Database connection closed")
         except Exception as e:
-            log_error(f"Error closing connection: {str(e)}")
+            log_error(f"Error closing cursor: {str(e)}")
+            reusable = False
+        if conn is not None:
+            release_connection(conn, database, schema, warehouse, reusable)
 
 
 @mcp.tool()
@@ -319,23 +787,26 @@ async def execute_snowflake_sql_query(
     Returns:
         Formatted string containing query results or error message
     """
-    if not query or not query.strip():
+    # Strip once; large queries would otherwise be rescanned on every use
+    query = query.strip() if query else ""
+    if not query:
         return "Error: Query cannot be empty"
     
     # Security check: Warn about potentially dangerous operations
-    query_upper = query.strip().upper()
-    dangerous_operations = ['DROP', 'DELETE', 'TRUNCATE', 'ALTER', 'CREATE USER', 'GRANT', 'REVOKE']
-    
-    for operation in dangerous_operations:
-        if query_upper.startswith(operation):
-            log_info(f"🚨 SECURITY ALERT: Executing potentially dangerous operation: {operation}")
-            break
+    # Only the leading keywords matter, so match against a short prefix
+    match = _DANGEROUS_RE.match(query[:64])
+    if match:
+        operation = " ".join(match.group(1).split()).upper()
+        log_warning(f"🚨 SECURITY ALERT: Executing potentially dangerous operation: {operation}")
     
     # Log query (sanitized - only first 50 chars to avoid logging sensitive data)
-    log_info(f"Executing query: {query[:50]}{'...' if len(query) > 50 else ''}")
+    if logger.isEnabledFor(logging.INFO):
+        log_info(f"Executing query: {query[:50]}{'...' if len(query) > 50 else ''}")
     
-    # Execute the query
-    result = execute_snowflake_query(query.strip(), database, schema, warehouse)
+    # Execute the query on a worker thread so the event loop stays responsive
+    result = await asyncio.to_thread(
+        execute_snowflake_query, query, database, schema, warehouse
+    )
     
     if result["success"]:
         # Format successful result
@@ -354,9 +825,10 @@ async def execute_snowflake_sql_query(
         if result.get("affected_rows") is not None:
             output_lines.append(f"Rows affected: {result['affected_rows']}")
         else:
-            if result["truncated"]:
+            shown_rows = min(result["row_count"], config.display_max_rows)
+            if shown_rows < result["row_count"] or result["truncated"]:
                 output_lines.append(
-                    f"Results: {result['total_rows']} rows (showing first {result['row_count']}), "
+                    f"Results: {result['total_rows']} rows (showing first {shown_rows}), "
                     f"{result['column_count']} columns"
                 )
             else:
@@ -366,27 +838,14 @@ async def execute_snowflake_sql_query(
         
         output_lines.extend(["", "Data:"])
         
-        # Format the dataframe
-        try:
-            with pd.option_context(
-                'display.max_colwidth', 50,
-                'display.width', 200,
-                'display.max_rows', None
-            ):
-                df_str = result["result_df"].to_string(index=False)
-                output_lines.append(df_str)
-        except Exception as e:
-            log_error(f"Error formatting results: {str(e)}")
-            output_lines.extend([
-                "Error formatting results for display.",
-                f"Data shape: {result['result_df'].shape}",
-                "Raw data available but too complex to display."
-            ])
+        # Results were already formatted on the worker thread
+        output_lines.append(result["output"])
         
         if result["truncated"]:
             output_lines.extend([
                 "",
-                f"⚠️  Results truncated. Showing first {config.max_rows} rows only.",
+                f"⚠️  Results truncated. Fetched first {config.max_rows} rows only "
+                f"(showing {min(result['row_count'], config.display_max_rows)}).",
                 "Consider adding LIMIT clause or filtering your query for better performance."
             ])
         
@@ -431,6 +890,7 @@ if __name__ == "__main__":
         log_info("Starting Snowflake MCP server...")
         log_info(f"Configuration: Account={config.account_identifier}, User={config.username}")
         log_info(f"Max rows limit: {config.max_rows}")
+        log_info(f"Display rows limit: {config.display_max_rows}")
         
         # Run the MCP server
         mcp.run()
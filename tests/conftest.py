@@ -0,0 +1,8 @@
+"""Shared test setup."""
+
+import os
+
+# The server module loads its configuration on import
+os.environ.setdefault("SNOWFLAKE_ACCOUNT", "test-account")
+os.environ.setdefault("SNOWFLAKE_USERNAME", "test-user")
+os.environ.setdefault("SNOWFLAKE_PASSWORD", "test-password")
@@ -0,0 +1,38 @@
+"""Tests for fetching result sets into DataFrames."""
+
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("mcp")
+pytest.importorskip("snowflake.connector")
+
+from snowflake_mcp_server import fetch_query_results  # noqa: E402
+
+
+class RowCursor:
+    """Cursor whose Arrow path must not be used."""
+
+    description = [
+        ("AMOUNT", 0, None, None, 38, 2, True),
+        ("ID", 0, None, None, 38, 0, False),
+    ]
+
+    def fetch_pandas_batches(self):
+        raise AssertionError("Arrow path used for scaled NUMBER column")
+
+    def fetchmany(self, size):
+        rows = [
+            (Decimal("12345678901234567890.12"), 1),
+            (None, 2),
+            (Decimal("1.50"), 3),
+        ]
+        return rows[:size]
+
+
+def test_scaled_numbers_keep_exact_decimals():
+    df, truncated = fetch_query_results(RowCursor(), max_rows=2)
+    assert truncated
+    assert df["AMOUNT"].tolist()[0] == Decimal("12345678901234567890.12")
+    assert df["ID"].tolist() == [1, 2]
@@ -0,0 +1,56 @@
+"""Tests for the result table formatter."""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("mcp")
+pytest.importorskip("snowflake.connector")
+
+from snowflake_mcp_server import format_dataframe  # noqa: E402
+
+
+def test_duplicate_column_names():
+    df = pd.DataFrame([[1, 2], [3, 4]], columns=["ID", "ID"])
+    assert format_dataframe(df).splitlines() == [
+        "ID  ID",
+        " 1   2",
+        " 3   4",
+    ]
+
+
+def test_nulls_render_as_null():
+    df = pd.DataFrame({"NAME": ["a", None], "SCORE": [1.5, float("nan")]})
+    assert format_dataframe(df).splitlines() == [
+        "NAME  SCORE",
+        "a       1.5",
+        "NULL   NULL",
+    ]
+
+
+def test_long_cells_are_cut():
+    df = pd.DataFrame({"TEXT": ["x" * 80, "short"]})
+    lines = format_dataframe(df, max_colwidth=10).splitlines()
+    assert lines[1] == "xxxxxxx..."
+    assert lines[2] == "short"
+
+
+def test_newlines_in_cells_are_flattened():
+    df = pd.DataFrame({"TEXT": ["a\nb\tc"]})
+    assert format_dataframe(df).splitlines()[1] == "a b c"
+
+
+def test_empty_frame_prints_header_only():
+    df = pd.DataFrame(columns=["A", "B"])
+    assert format_dataframe(df) == "A  B"
+
+
+def test_no_columns():
+    assert format_dataframe(pd.DataFrame()) == ""
+
+
+def test_oversized_cell_is_cut_without_widening_column():
+    df = pd.DataFrame({"DOC": ["{" + "x" * 2_000_000 + "}", "small"]})
+    lines = format_dataframe(df, max_colwidth=20).splitlines()
+    assert lines[1] == "{" + "x" * 16 + "..."
+    assert lines[2] == "small"
+    assert max(len(line) for line in lines) == 20
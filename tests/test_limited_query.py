@@ -0,0 +1,122 @@
+"""Tests for pushing the row limit into SELECT queries."""
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("mcp")
+snowflake_connector = pytest.importorskip("snowflake.connector")
+
+import snowflake_mcp_server as server  # noqa: E402
+from snowflake_mcp_server import build_limited_query, has_top_level_order_by  # noqa: E402
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM t ORDER BY a",
+    "select a from t order\n  by a desc",
+    "SELECT a FROM t UNION ALL SELECT b FROM u ORDER BY 1",
+    "SELECT 'it''s' AS s FROM t ORDER BY s",
+    "WITH x AS (SELECT * FROM t) SELECT * FROM x ORDER BY 1;",
+])
+def test_top_level_order_by(query):
+    assert has_top_level_order_by(query)
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT ROW_NUMBER() OVER (ORDER BY a) FROM t",
+    "WITH x AS (SELECT * FROM t ORDER BY a) SELECT * FROM x",
+    "SELECT 'order by' FROM t",
+    "SELECT 'it''s order by' FROM t",
+    "SELECT $$ ORDER BY $$ FROM t",
+    'SELECT "ORDER BY" FROM t',
+    "SELECT a FROM t -- ORDER BY a",
+    "SELECT a FROM t // ORDER BY a",
+    "SELECT a FROM t /* ORDER BY a */",
+])
+def test_no_top_level_order_by(query):
+    assert not has_top_level_order_by(query)
+
+
+def test_select_is_wrapped_without_trailing_semicolon():
+    assert build_limited_query("SELECT * FROM t;  ", 11) == (
+        "SELECT * FROM (\nSELECT * FROM t\n) LIMIT 11"
+    )
+
+
+def test_cte_is_wrapped():
+    wrapped = build_limited_query("WITH x AS (SELECT 1) SELECT * FROM x", 5)
+    assert wrapped.startswith("SELECT * FROM (\nWITH x AS")
+    assert wrapped.endswith(") LIMIT 5")
+
+
+def test_trailing_line_comment_does_not_swallow_paren():
+    wrapped = build_limited_query("SELECT * FROM t -- note", 5)
+    assert wrapped.endswith("-- note\n) LIMIT 5")
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM t ORDER BY a",
+    "SELECT a FROM t UNION SELECT b FROM u ORDER BY 1",
+    "SHOW TABLES",
+    "DESCRIBE TABLE t",
+    "INSERT INTO t SELECT * FROM u",
+    "",
+])
+def test_not_wrapped(query):
+    assert build_limited_query(query, 5) is None
+
+
+class FakeCursor:
+    """Cursor that rejects the LIMIT-wrapped statement with a given errno."""
+
+    def __init__(self, errno):
+        self.errno = errno
+        self.executed = []
+        self.description = None
+        self.rowcount = 0
+        self.arraysize = 1
+
+    def execute(self, sql):
+        self.executed.append(sql)
+        if sql.startswith("SELECT * FROM (\n"):
+            raise snowflake_connector.errors.ProgrammingError(
+                msg="wrapped query failed", errno=self.errno
+            )
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    database = schema = warehouse = role = None
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+
+@pytest.fixture
+def fake_cursor(monkeypatch, request):
+    cursor = FakeCursor(request.param)
+    monkeypatch.setattr(
+        server, "checkout_connection", lambda *args: FakeConnection(cursor)
+    )
+    monkeypatch.setattr(server, "release_connection", lambda *args: None)
+    return cursor
+
+
+@pytest.mark.parametrize("fake_cursor", [1003, 2025], indirect=True)
+def test_wrap_compile_errors_retry_raw_statement(fake_cursor):
+    result = server.execute_snowflake_query("SELECT a.id, b.id FROM a JOIN b")
+    assert result["success"]
+    assert fake_cursor.executed[1] == "SELECT a.id, b.id FROM a JOIN b"
+    assert len(fake_cursor.executed) == 2
+
+
+@pytest.mark.parametrize("fake_cursor", [2003, 630], indirect=True)
+def test_other_errors_are_not_retried(fake_cursor):
+    result = server.execute_snowflake_query("SELECT * FROM missing")
+    assert not result["success"]
+    assert result["error_type"] == "SQL_ERROR"
+    assert len(fake_cursor.executed) == 1